@@ -4,12 +4,59 @@ Live Test Suite - Test actual autorun CLI with trending repos
 Tests both success and failure modes
 """
 
+import hashlib
 import subprocess
 import json
+import os
+import shutil
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _write_json(path: Path, obj: Dict) -> None:
+    """Serialize a result/report to disk, via orjson when available (its C
+    serializer is roughly an order of magnitude faster than json.dumps)."""
+    if orjson is not None:
+        path.write_bytes(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+    else:
+        path.write_text(json.dumps(obj, indent=2))
+
+# Expected install/run commands per dependency type, consulted in priority
+# order - built once at import instead of re-evaluated ternary chains per repo
+DEP_PRIORITY = ("python", "node", "rust")
+INSTALL_COMMANDS = {
+    "python": "pip install -r requirements.txt",
+    "node": "npm install",
+    "rust": "cargo build",
+}
+RUN_COMMANDS = {
+    "python": "python main.py",
+    "node": "npm start",
+    "rust": "cargo run",
+}
+
+# Manifest probes in detection order; the first hit per dependency type wins
+DEP_MANIFESTS = (
+    ("requirements.txt", "python"),
+    ("Pipfile", "python"),
+    ("pyproject.toml", "python"),
+    ("setup.py", "python"),
+    ("package.json", "node"),
+    ("Cargo.toml", "rust"),
+    ("go.mod", "go"),
+    ("CMakeLists.txt", "cpp"),
+    ("Makefile", "cpp"),
+)
 
 # Trending repos from https://github.com/trending?since=daily
 TEST_REPOS = [
@@ -29,30 +76,105 @@ TEST_REPOS = [
 class LiveTestRunner:
     def __init__(self, test_dir: str = "/tmp/autorun_live_tests"):
         self.test_dir = Path(test_dir)
+        self.logs_dir = self.test_dir / "logs"
+        self.reports_dir = self.test_dir / "reports"
+        self.repos_dir = self.test_dir / "repos"
+        self.cache_dir = self.test_dir / "cache"
         self.results: List[Dict] = []
-        
+        self._results_lock = threading.Lock()
+
     def setup(self) -> None:
-        self.test_dir.mkdir(parents=True, exist_ok=True)
-        (self.test_dir / "logs").mkdir(exist_ok=True)
-        (self.test_dir / "reports").mkdir(exist_ok=True)
-        (self.test_dir / "repos").mkdir(exist_ok=True)
-        
+        # parents=True covers test_dir itself, so one pass creates everything
+        for subdir in (self.logs_dir, self.reports_dir, self.repos_dir, self.cache_dir):
+            subdir.mkdir(parents=True, exist_ok=True)
+        self.gc_older_than(days=7)
+
+    def gc_older_than(self, days: int = 7) -> None:
+        """Drop clones and analysis caches untouched for `days`, so the
+        hash-addressed layout does not grow without bound as the repo list
+        changes between runs."""
+        cutoff = time.time() - days * 86400
+        for base in (self.repos_dir, self.cache_dir):
+            with os.scandir(base) as it:
+                entries = list(it)
+            for entry in entries:
+                try:
+                    if entry.stat(follow_symlinks=False).st_mtime >= cutoff:
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        shutil.rmtree(entry.path)
+                    else:
+                        os.unlink(entry.path)
+                except OSError:
+                    pass  # raced with a concurrent run or already gone
+
+    def head_sha(self, repo_dir: Path) -> Optional[str]:
+        """HEAD commit of a cloned repo, or None if it cannot be resolved"""
+        try:
+            result = subprocess.run(
+                ["git", "-C", str(repo_dir), "rev-parse", "HEAD"],
+                capture_output=True,
+                text=True,
+                timeout=10
+            )
+            return result.stdout.strip() if result.returncode == 0 else None
+        except Exception:
+            return None
+
+    def load_cached_analysis(self, cache_path: Path, sha: str) -> Optional[Dict]:
+        if not cache_path.exists():
+            return None
+        try:
+            cached = json.loads(cache_path.read_text())
+            if cached.get("sha") == sha:
+                return cached["result"]
+        except (json.JSONDecodeError, KeyError):
+            pass
+        return None
+
+    def repo_cache_key(self, repo: str) -> str:
+        """On-disk key for a repo's clone and analysis cache: a hash of the
+        clone URL, so repo names that slugify identically cannot alias each
+        other's artifacts."""
+        repo_url = f"https://github.com/{repo}.git"
+        return hashlib.sha1(repo_url.encode()).hexdigest()[:16]
+
+    def repo_cache_dir(self, repo: str) -> Path:
+        return self.repos_dir / self.repo_cache_key(repo)
+
     def clone_repo(self, repo: str) -> Tuple[bool, Path]:
         """Clone repo and return path if successful"""
         repo_url = f"https://github.com/{repo}.git"
-        repo_dir = self.test_dir / "repos" / repo.replace("/", "_")
-        
-        if repo_dir.exists():
+        repo_dir = self.repo_cache_dir(repo)
+
+        if (repo_dir / ".git").exists():
             return True, repo_dir
-        
+
+        if repo_dir.exists():
+            # leftover from an aborted clone - reclone from scratch
+            shutil.rmtree(repo_dir)
+
         try:
-            result = subprocess.run(
-                ["git", "clone", "--depth", "1", repo_url, str(repo_dir)],
-                capture_output=True,
+            # Blob-filtered sparse clone: checkout materializes only the
+            # top-level files, which is all the README/manifest probes need.
+            # Disable the terminal prompt so private/404 repos fail fast
+            # instead of hanging until timeout.
+            proc = subprocess.Popen(
+                ["git", "-c", "protocol.version=2", "clone",
+                 "--depth", "1", "--filter=blob:none", "--sparse", "--no-tags",
+                 "--single-branch", "--jobs", "4", repo_url, str(repo_dir)],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
                 text=True,
-                timeout=60
+                env={**os.environ, "GIT_TERMINAL_PROMPT": "0"}
             )
-            return result.returncode == 0, repo_dir
+            try:
+                proc.communicate(timeout=60)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.communicate()
+                return False, repo_dir
+            return proc.returncode == 0, repo_dir
         except Exception as e:
             return False, repo_dir
     
@@ -80,49 +202,63 @@ class LiveTestRunner:
             result["failure_mode"] = True
             result["failure_reason"] = f"Failed to clone {repo['name']}"
             return result
-        
-        # Would find README
-        readme_path = repo_dir / "README.md"
-        if readme_path.exists():
-            result["would_readme"] = "README.md found"
+
+        # Repos already analyzed at this HEAD in a previous run are served
+        # from the cache instead of re-scanning the working tree
+        sha = self.head_sha(repo_dir)
+        cache_path = self.cache_dir / f"{self.repo_cache_key(repo['name'])}.json"
+        if sha:
+            cached = self.load_cached_analysis(cache_path, sha)
+            if cached is not None:
+                cached["timestamp"] = result["timestamp"]
+                return cached
+
+        # One directory read serves both the README lookup and the
+        # manifest probes below, instead of a stat syscall per candidate.
+        # Manifests are matched against regular files only, decided from the
+        # dirent type so symlinks are never resolved.
+        with os.scandir(repo_dir) as it:
+            entries = list(it)
+        names = {e.name for e in entries}
+        file_names = {e.name for e in entries if e.is_file(follow_symlinks=False)}
+
+        # Would find README (case-insensitive, so Readme.md/README.MD also match)
+        lower_map = {n.lower(): n for n in names}
+        readme_name = next(
+            (lower_map[k] for k in ("readme.md", "readme", "readme.txt") if k in lower_map),
+            None
+        )
+        if readme_name:
+            result["would_readme"] = f"{readme_name} found"
         else:
-            readme_alternatives = ["README.txt", "README", "readme.md", "readme.txt", "readme"]
-            found = False
-            for alt in readme_alternatives:
-                if (repo_dir / alt).exists():
-                    result["would_readme"] = f"{alt} found"
-                    found = True
-                    break
-            if not found:
-                result["would_readme"] = "No README found"
-                result["failure_mode"] = True
-                result["failure_reason"] = "No README found - autorun would exit with code 1"
-        
-        # Would detect dependencies
-        deps = {
-            "python": ["requirements.txt", "Pipfile", "pyproject.toml", "setup.py"],
-            "node": ["package.json"],
-            "rust": ["Cargo.toml"],
-            "go": ["go.mod"],
-            "cpp": ["CMakeLists.txt", "Makefile"],
-        }
-        
+            result["would_readme"] = "No README found"
+            result["failure_mode"] = True
+            result["failure_reason"] = "No README found - autorun would exit with code 1"
+            # autorun exits right here, so skip dependency detection and the
+            # AI plan instead of modelling steps that would never run
+            if sha:
+                _write_json(cache_path, {"sha": sha, "result": result})
+            return result
+
+        # Would detect dependencies - one pass over the flat manifest table,
+        # skipping types already detected
         detected_deps = []
-        for dep_type, manifests in deps.items():
-            for manifest in manifests:
-                if (repo_dir / manifest).exists():
-                    detected_deps.append(f"{dep_type} ({manifest})")
-                    break
+        detected_types = set()
+        for manifest, dep_type in DEP_MANIFESTS:
+            if dep_type not in detected_types and manifest in file_names:
+                detected_deps.append(f"{dep_type} ({manifest})")
+                detected_types.add(dep_type)
         
         result["would_detect_deps"] = detected_deps if detected_deps else "none detected"
         
         # Would ask AI for action plan
+        primary_type = next((t for t in DEP_PRIORITY if t in detected_types), None)
         result["would_ask_ai"] = {
             "prompt": f"Determine how to run {repo['name']} from README",
             "expected_response": {
                 "language": repo["language"].lower(),
-                "install": "pip install -r requirements.txt" if "python" in str(detected_deps).lower() else "npm install" if "node" in str(detected_deps).lower() else "cargo build" if "rust" in str(detected_deps).lower() else "make",
-                "run": "python main.py" if "python" in str(detected_deps).lower() else "npm start" if "node" in str(detected_deps).lower() else "cargo run" if "rust" in str(detected_deps).lower() else "./bin/gog" if "steipete/gogcli" in repo["name"] else "Unknown"
+                "install": INSTALL_COMMANDS.get(primary_type, "make"),
+                "run": RUN_COMMANDS[primary_type] if primary_type else "./bin/gog" if "steipete/gogcli" in repo["name"] else "Unknown"
             }
         }
         
@@ -134,12 +270,7 @@ class LiveTestRunner:
         
         # Would run project
         result["would_run"] = "Would execute the determined run command"
-        
-        # Check for failure modes
-        if result["would_readme"] == "No README found":
-            result["failure_mode"] = True
-            result["failure_reason"] = "No README found - autorun would exit with code 1"
-        
+
         # Test: What if AI returns empty response?
         # This tests the failure mode we just added to cli.py
         if result["would_readme"] and not detected_deps:
@@ -149,7 +280,10 @@ class LiveTestRunner:
             result["would_ask_ai"]["failure_message"] = "AI could not determine action - would exit gracefully"
             result["failure_mode"] = True
             result["failure_reason"] = "AI failure mode - no clear instructions found"
-        
+
+        if sha:
+            _write_json(cache_path, {"sha": sha, "result": result})
+
         return result
     
     def run_live_tests(self) -> Dict:
@@ -159,16 +293,26 @@ class LiveTestRunner:
         print("This tests the autorun CLI logic WITHOUT actually running/installing anything")
         print("(Dry-run mode)")
         
-        for repo in TEST_REPOS:
-            result = self.test_autorun_cli(repo)
-            self.results.append(result)
-            
-            repo_name = repo["name"].replace("/", "_")
-            result_path = self.test_dir / "logs" / f"{repo_name}_live_test.json"
-            result_path.write_text(json.dumps(result, indent=2))
-            
-            status = "FAIL" if result["failure_mode"] else "PASS"
-            print(f"  {status} {repo['name']}")
+        # Clones are network-bound and independent, so run them concurrently;
+        # subprocess.run releases the GIL while waiting on git. Log writes go
+        # to a dedicated writer thread so serialization and disk I/O never
+        # block the loop that is collecting results.
+        log_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="log-writer")
+        with ThreadPoolExecutor(max_workers=min(len(TEST_REPOS), 8)) as executor:
+            futures = {executor.submit(self.test_autorun_cli, repo): repo for repo in TEST_REPOS}
+            for future in as_completed(futures):
+                repo = futures[future]
+                result = future.result()
+                with self._results_lock:
+                    self.results.append(result)
+
+                repo_name = repo["name"].replace("/", "_")
+                result_path = self.logs_dir / f"{repo_name}_live_test.json"
+                log_writer.submit(_write_json, result_path, result)
+
+                status = "FAIL" if result["failure_mode"] else "PASS"
+                print(f"  {status} {repo['name']}")
+        log_writer.shutdown(wait=True)
         
         return self.generate_report()
     
@@ -187,13 +331,13 @@ class LiveTestRunner:
             "summary": {
                 "would_clone_all": True,
                 "would_readme_detection": "100% (all repos have READMEs)",
-                "would_dependency_detection": f"{sum(1 for r in self.results if r['would_detect_deps'] != 'none detected')} / {total} repos with detectable deps",
+                "would_dependency_detection": f"{sum(1 for r in self.results if r['would_detect_deps'] not in (None, 'none detected'))} / {total} repos with detectable deps",
                 "would_failure_handling": f"{failures} repos would trigger failure mode (graceful exit)",
             }
         }
         
-        report_path = self.test_dir / "reports" / "live_test_report.json"
-        report_path.write_text(json.dumps(report, indent=2))
+        report_path = self.reports_dir / "live_test_report.json"
+        _write_json(report_path, report)
         
         return report
     
@@ -214,7 +358,10 @@ class LiveTestRunner:
             for failure in report['failure_modes']:
                 print(f"\n  {failure['repo']}:")
                 print(f"    Reason: {failure['failure_reason']}")
-                if failure.get('would_ask_ai', {}).get('would_fail'):
+                # would_ask_ai is stored as None (not a missing key) when the
+                # run short-circuited before the AI step, so .get's default
+                # never kicks in
+                if (failure.get('would_ask_ai') or {}).get('would_fail'):
                     print(f"    AI would respond: {failure['would_ask_ai']['ai_response']}")
         
         print("\n" + "=" * 70)
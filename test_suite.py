@@ -7,13 +7,69 @@ Test 1: Analyze repo README and generate action plan (no execution)
 Test 2: Validate action plan can be executed safely (dry-run mode)
 """
 
+import hashlib
 import subprocess
 import json
+import multiprocessing
+import os
+import re
 import sys
 import shutil
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _write_json(path: Path, obj: Dict) -> None:
+    """Serialize a result/report to disk, via orjson when available (its C
+    serializer is roughly an order of magnitude faster than json.dumps)."""
+    if orjson is not None:
+        path.write_bytes(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+    else:
+        path.write_text(json.dumps(obj, indent=2))
+
+
+def _read_text(path: Path) -> str:
+    """Read a README as text; undecodable bytes are replaced rather than
+    failing the repo, since the downstream scan only looks for command-like
+    ASCII lines."""
+    return path.read_text(errors="replace")
+
+
+# Lines that look like shell commands, and of those, ones that mention
+# running/building - compiled once instead of rescanned per README line
+_CMD_HINT_RE = re.compile(r"npm run|npm start|python|cargo run|make|\./")
+_RUN_HINT_RE = re.compile(r"run|start|build")
+
+# READMEs below this size are scanned inline; only unusually large files are
+# worth a process round-trip
+_CPU_SCAN_THRESHOLD = 1 << 20
+
+
+def _scan_run_commands(readme_content: str) -> List[str]:
+    """Pull up to five command-looking lines out of a README.
+
+    Module-level (not a method) so it pickles cleanly for the process pool.
+    """
+    run_commands: List[str] = []
+    for line in readme_content.splitlines():
+        line_lower = line.lower()
+        if _CMD_HINT_RE.search(line_lower) and _RUN_HINT_RE.search(line_lower):
+            cmd = line.strip().strip('`').strip()
+            if cmd and not cmd.startswith('#') and not cmd.startswith('<!--'):
+                run_commands.append(cmd)
+                if len(run_commands) == 5:
+                    break
+    return run_commands
 
 
 TEST_REPOS = [
@@ -33,44 +89,143 @@ TEST_REPOS = [
 class TestRunner:
     def __init__(self, test_dir: str = "/tmp/autorun_tests"):
         self.test_dir = Path(test_dir)
+        self.logs_dir = self.test_dir / "logs"
+        self.reports_dir = self.test_dir / "reports"
+        self.repos_dir = self.test_dir / "repos"
+        self.cache_dir = self.test_dir / "cache"
         self.results: List[Dict] = []
-        
+        self._results_lock = threading.Lock()
+        self._cpu_pool: Optional[ProcessPoolExecutor] = None
+        self._cpu_pool_lock = threading.Lock()
+
+    def scan_run_commands(self, readme_content: str) -> List[str]:
+        """Scan a README for run commands, shipping very large files to a
+        process pool so the GIL-bound scan does not serialize the analysis
+        threads."""
+        if len(readme_content) < _CPU_SCAN_THRESHOLD:
+            return _scan_run_commands(readme_content)
+        with self._cpu_pool_lock:
+            if self._cpu_pool is None:
+                # spawn, not fork: this pool is first created from inside the
+                # analysis threads, and forking a multi-threaded process can
+                # deadlock the children
+                self._cpu_pool = ProcessPoolExecutor(
+                    max_workers=os.cpu_count(),
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+        return self._cpu_pool.submit(_scan_run_commands, readme_content).result()
+
     def setup(self) -> None:
-        self.test_dir.mkdir(parents=True, exist_ok=True)
-        (self.test_dir / "logs").mkdir(exist_ok=True)
-        (self.test_dir / "reports").mkdir(exist_ok=True)
-        (self.test_dir / "repos").mkdir(exist_ok=True)
-        
+        # parents=True covers test_dir itself, so one pass creates everything
+        for subdir in (self.logs_dir, self.reports_dir, self.repos_dir, self.cache_dir):
+            subdir.mkdir(parents=True, exist_ok=True)
+        self.gc_older_than(days=7)
+
+    def gc_older_than(self, days: int = 7) -> None:
+        """Drop clones and analysis caches untouched for `days`, so the
+        hash-addressed layout does not grow without bound as the repo list
+        changes between runs."""
+        cutoff = time.time() - days * 86400
+        for base in (self.repos_dir, self.cache_dir):
+            with os.scandir(base) as it:
+                entries = list(it)
+            for entry in entries:
+                try:
+                    if entry.stat(follow_symlinks=False).st_mtime >= cutoff:
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        shutil.rmtree(entry.path)
+                    else:
+                        os.unlink(entry.path)
+                except OSError:
+                    pass  # raced with a concurrent run or already gone
+
+    def head_sha(self, repo_dir: Path) -> Optional[str]:
+        """HEAD commit of a cloned repo, or None if it cannot be resolved"""
+        try:
+            result = subprocess.run(
+                ["git", "-C", str(repo_dir), "rev-parse", "HEAD"],
+                capture_output=True,
+                text=True,
+                timeout=10
+            )
+            return result.stdout.strip() if result.returncode == 0 else None
+        except Exception:
+            return None
+
+    def load_cached_analysis(self, cache_path: Path, sha: str) -> Optional[Dict]:
+        if not cache_path.exists():
+            return None
+        try:
+            cached = json.loads(cache_path.read_text())
+            if cached.get("sha") == sha:
+                return cached["result"]
+        except (json.JSONDecodeError, KeyError):
+            pass
+        return None
+
+    def repo_cache_key(self, repo: str) -> str:
+        """On-disk key for a repo's clone and analysis cache: a hash of the
+        clone URL, so repo names that slugify identically cannot alias each
+        other's artifacts."""
+        repo_url = f"https://github.com/{repo}.git"
+        return hashlib.sha1(repo_url.encode()).hexdigest()[:16]
+
+    def repo_cache_dir(self, repo: str) -> Path:
+        return self.repos_dir / self.repo_cache_key(repo)
+
     def clone_repo(self, repo: str) -> Tuple[bool, str]:
         repo_url = f"https://github.com/{repo}.git"
-        clone_dir = self.test_dir / "repos" / repo.replace("/", "_")
-        
-        if clone_dir.exists():
+        clone_dir = self.repo_cache_dir(repo)
+
+        if (clone_dir / ".git").exists():
             return True, "Already cloned"
-        
+
+        if clone_dir.exists():
+            # leftover from an aborted clone - reclone from scratch
+            shutil.rmtree(clone_dir)
+
         try:
-            result = subprocess.run(
-                ["git", "clone", "--depth", "1", repo_url, str(clone_dir)],
-                capture_output=True,
+            # Blob-filtered sparse clone: checkout materializes only the
+            # top-level files, which is all the README/manifest probes need.
+            # Disable the terminal prompt so private/404 repos fail fast
+            # instead of hanging until timeout.
+            proc = subprocess.Popen(
+                ["git", "-c", "protocol.version=2", "clone",
+                 "--depth", "1", "--filter=blob:none", "--sparse", "--no-tags",
+                 "--single-branch", "--jobs", "4", repo_url, str(clone_dir)],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
                 text=True,
-                timeout=60
+                env={**os.environ, "GIT_TERMINAL_PROMPT": "0"}
             )
-            return result.returncode == 0, result.stdout + result.stderr
+            try:
+                stdout, stderr = proc.communicate(timeout=60)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.communicate()
+                return False, f"Clone timed out after 60s: {repo_url}"
+            return proc.returncode == 0, stdout + stderr
         except Exception as e:
             return False, str(e)
     
     def read_readme(self, repo_dir: Path) -> Tuple[bool, str]:
-        readme_paths = ["README.md", "readme.md", "README", "readme"]
-        
-        for readme in readme_paths:
-            readme_path = repo_dir / readme
-            if readme_path.exists():
-                try:
-                    return True, readme_path.read_text()
-                except Exception as e:
-                    return False, str(e)
-        
-        return False, "No README found"
+        # One directory read, matched case-insensitively so Readme.md and
+        # README.MD variants are picked up too
+        with os.scandir(repo_dir) as it:
+            lower_map = {entry.name.lower(): entry.name for entry in it}
+
+        readme_name = next(
+            (lower_map[k] for k in ("readme.md", "readme", "readme.txt") if k in lower_map),
+            None
+        )
+        if readme_name is None:
+            return False, "No README found"
+
+        try:
+            return True, _read_text(repo_dir / readme_name)
+        except Exception as e:
+            return False, str(e)
     
     def detect_dependencies(self, repo_dir: Path) -> Dict:
         dependencies = {
@@ -94,14 +249,20 @@ class TestRunner:
             ("Makefile", "other"),
         ]
         
+        # One directory read instead of a stat syscall per manifest name.
+        # is_file(follow_symlinks=False) comes from the dirent type, so no
+        # extra stat and no symlink resolution; a symlinked or directory
+        # "Makefile" is not a manifest we can hand to a build tool anyway.
+        with os.scandir(repo_dir) as it:
+            names = {entry.name for entry in it if entry.is_file(follow_symlinks=False)}
+
         for manifest, dep_type in checks:
-            manifest_path = repo_dir / manifest
-            if manifest_path.exists():
+            if manifest in names:
                 if dep_type == "other":
                     dependencies["other"].append(manifest)
                 else:
                     dependencies[dep_type] = True
-        
+
         return dependencies
     
     def generate_action_plan(self, repo: str, readme_content: str, dependencies: Dict, repo_dir: Path) -> Dict:
@@ -120,17 +281,8 @@ class TestRunner:
             "dry_run_notes": []
         }
         
-        lines = readme_content.split('\n')
-        for line in lines:
-            line_lower = line.lower().strip()
-            if any(cmd in line_lower for cmd in ["npm run", "npm start", "python", "cargo run", "make", "./"]):
-                if "run" in line_lower or "start" in line_lower or "build" in line_lower:
-                    cmd = line.strip().strip('`').strip()
-                    if cmd and not cmd.startswith('#') and not cmd.startswith('<!--'):
-                        plan["run_commands"].append(cmd)
-        
-        plan["run_commands"] = plan["run_commands"][:5]
-        
+        plan["run_commands"] = self.scan_run_commands(readme_content)
+
         plan["dry_run_notes"].append(f"[DRY-RUN] Would clone {repo}")
         plan["dry_run_notes"].append(f"[DRY-RUN] Would install dependencies based on detected manifests")
         plan["dry_run_notes"].append(f"[DRY-RUN] Would execute: {plan['run_commands'][0] if plan['run_commands'] else 'unknown'}")
@@ -145,7 +297,7 @@ class TestRunner:
             "repo": repo["name"],
             "timestamp": datetime.now().isoformat(),
             "clone": {"success": False, "error": None},
-            "readme": {"found": False, "content": None, "error": None},
+            "readme": {"found": False, "chars": 0, "error": None},
             "dependencies": {},
             "action_plan": {},
         }
@@ -157,10 +309,21 @@ class TestRunner:
         if not success:
             return result
         
-        repo_dir = self.test_dir / "repos" / repo["name"].replace("/", "_")
+        repo_dir = self.repo_cache_dir(repo["name"])
+
+        # Repos already analyzed at this HEAD in a previous run are served
+        # from the cache instead of re-scanning the working tree
+        sha = self.head_sha(repo_dir)
+        cache_path = self.cache_dir / f"{self.repo_cache_key(repo['name'])}.json"
+        if sha:
+            cached = self.load_cached_analysis(cache_path, sha)
+            if cached is not None:
+                cached["timestamp"] = result["timestamp"]
+                return cached
+
         success, output = self.read_readme(repo_dir)
         result["readme"]["found"] = success
-        result["readme"]["content"] = output if success else None
+        result["readme"]["chars"] = len(output) if success else 0
         result["readme"]["error"] = output if not success else None
         
         if not success:
@@ -168,7 +331,10 @@ class TestRunner:
         
         result["dependencies"] = self.detect_dependencies(repo_dir)
         result["action_plan"] = self.generate_action_plan(repo["name"], output, result["dependencies"], repo_dir)
-        
+
+        if sha:
+            _write_json(cache_path, {"sha": sha, "result": result})
+
         return result
     
     def run_tests(self) -> Dict:
@@ -176,17 +342,31 @@ class TestRunner:
         
         print(f"Running tests on {len(TEST_REPOS)} repositories...")
         
-        for repo in TEST_REPOS:
-            result = self.analyze_repo(repo)
-            self.results.append(result)
-            
-            repo_name = repo["name"].replace("/", "_")
-            result_path = self.test_dir / "logs" / f"{repo_name}.json"
-            result_path.write_text(json.dumps(result, indent=2))
-            
-            status = "PASS" if result["clone"]["success"] else "FAIL"
-            print(f"  {status} {repo['name']}")
-        
+        # Clones are network-bound and independent, so run them concurrently;
+        # subprocess.run releases the GIL while waiting on git. Log writes go
+        # to a dedicated writer thread so serialization and disk I/O never
+        # block the loop that is collecting results.
+        log_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="log-writer")
+        with ThreadPoolExecutor(max_workers=min(len(TEST_REPOS), 8)) as executor:
+            futures = {executor.submit(self.analyze_repo, repo): repo for repo in TEST_REPOS}
+            for future in as_completed(futures):
+                repo = futures[future]
+                result = future.result()
+                with self._results_lock:
+                    self.results.append(result)
+
+                repo_name = repo["name"].replace("/", "_")
+                result_path = self.logs_dir / f"{repo_name}.json"
+                log_writer.submit(_write_json, result_path, result)
+
+                status = "PASS" if result["clone"]["success"] else "FAIL"
+                print(f"  {status} {repo['name']}")
+        log_writer.shutdown(wait=True)
+
+        if self._cpu_pool is not None:
+            self._cpu_pool.shutdown()
+            self._cpu_pool = None
+
         return self.generate_report()
     
     def generate_report(self) -> Dict:
@@ -207,18 +387,20 @@ class TestRunner:
             }
         }
         
-        report_path = self.test_dir / "reports" / "test_report.json"
-        report_path.write_text(json.dumps(report, indent=2))
+        report_path = self.reports_dir / "test_report.json"
+        _write_json(report_path, report)
         
         return report
     
     def _aggregate_dependencies(self) -> Dict[str, int]:
-        dep_counts = {}
-        for result in self.results:
-            for dep, found in result["dependencies"].items():
-                if found and dep != "other":
-                    dep_counts[dep] = dep_counts.get(dep, 0) + 1
-        return dict(sorted(dep_counts.items(), key=lambda x: x[1], reverse=True))
+        # Counter accumulates in C and most_common gives the sorted view
+        dep_counts = Counter(
+            dep
+            for result in self.results
+            for dep, found in result["dependencies"].items()
+            if found and dep != "other"
+        )
+        return dict(dep_counts.most_common())
     
     def print_report(self, report: Dict) -> None:
         print("\n" + "=" * 60)